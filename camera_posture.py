@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 import cv2, os, math
+import numpy as np
 
 @dataclass
 class PostureConfig:
@@ -24,7 +25,6 @@ class PostureMonitor:
             raise FileNotFoundError(f"Não encontrei {face_cascade_filename}")
         self.face_cascade = cv2.CascadeClassifier(cascade_path)
 
-        import cv2.data  # Explicitly import cv2.data to ensure haarcascades path is available
         eye_cascade_candidates = [
             os.path.join(cv2.data.haarcascades, eye_cascade_filename),
             f"/usr/share/opencv4/haarcascades/{eye_cascade_filename}",
@@ -36,7 +36,6 @@ class PostureMonitor:
         self.eye_cascade = cv2.CascadeClassifier(eye_cascade_path)
 
     def _get_eye_angle(self, face_roi_gray):
-        import numpy as np
         eyes = self.eye_cascade.detectMultiScale(face_roi_gray, 1.1, 5)
         if len(eyes) < 2:
             return 0.0
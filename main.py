@@ -57,6 +57,8 @@ logging.basicConfig(
 POSTURE_CSV = LOG_DIR / "posture_events.csv"
 TASK_CSV = LOG_DIR / "task_events.csv"
 LAST_POSTURE_JPEG = BASE_DIR / "last_posture.jpg"
+POSTURE_FIELDS = ["timestamp", "ok", "reason", "tilt_deg", "nod_deg", "session_adjustments", "tasks_completed_today"]
+TASK_FIELDS = ["timestamp", "action", "task", "section_title"]
 
 # Load from environment or set defaults
 MOTION_ENABLE_OCR = os.getenv("MOTION_ENABLE_OCR", "1") == "1"
@@ -154,37 +156,51 @@ class PiProductivity:
                 writer.writeheader()
             writer.writerow(event_data)
 
+    @staticmethod
+    def _csv_field(value):
+        """Make free-form text safe to write as an unquoted CSV field."""
+        return str(value).replace(",", " ").replace('"', "'").replace("\r", " ").replace("\n", " ")
+
+    def _append_csv_line(self, file_path, fieldnames, line):
+        # Rows have a fixed schema and pre-sanitised fields, so they are
+        # formatted directly; csv.writer is only needed for the header.
+        file_exists = os.path.isfile(file_path)
+        with open(file_path, "a", newline="", encoding="utf-8") as f:
+            if not file_exists:
+                csv.writer(f).writerow(fieldnames)
+            f.write(line)
+
     def log_task_event(self, action, task_name="", section_title=""):
-        fieldnames = ["timestamp", "action", "task", "section_title"]
-        event = {
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "action": action,
-            "task": task_name,
-            "section_title": section_title,
-        }
-        self.log_event(TASK_CSV, fieldnames, event)
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        task = self._csv_field(task_name)
+        section = self._csv_field(section_title)
+        self._append_csv_line(TASK_CSV, TASK_FIELDS, f"{ts},{action},{task},{section}\r\n")
         logging.info(f"Logged task event: action={action}, task={task_name}")
 
     def _log_posture_csv(self, status):
         ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        row = [
-            ts,
-            1 if status.get("ok") else 0,
-            status.get("reason") or "",
-            f"{status.get('tilt',0):.1f}",
-            f"{status.get('nod',0):.1f}",
-            self.posture_adjust_count,
-            self.tasks_completed_today,
-        ]
-        self.log_event(POSTURE_CSV, ["timestamp", "ok", "reason", "tilt_deg", "nod_deg", "session_adjustments", "tasks_completed_today"], dict(zip(["timestamp", "ok", "reason", "tilt_deg", "nod_deg", "session_adjustments", "tasks_completed_today"], row)))
+        ok = 1 if status.get("ok") else 0
+        reason = self._csv_field(status.get("reason") or "")
+        line = (
+            f"{ts},{ok},{reason},{status.get('tilt',0):.1f},{status.get('nod',0):.1f},"
+            f"{self.posture_adjust_count},{self.tasks_completed_today}\r\n"
+        )
+        self._append_csv_line(POSTURE_CSV, POSTURE_FIELDS, line)
 
 
     # --- Core Logic Methods ---
     def capture_array(self):
+        """Grab a frame from the shared Picamera2 instance.
+
+        Posture checks, OCR and the web camera feed all run on different
+        threads; every capture goes through ``_cam_lock`` so picamera2 never
+        sees concurrent requests. Each call returns a new array, so callers
+        may keep or hand off the frame without copying it.
+        """
         if not self.camera:
             return None
         with self._cam_lock:
-            return self.camera.capture_array()
+            return self.camera.capture_array("main")
 
     def read_jpeg(self) -> bytes | None:
         frame = self.capture_array()
@@ -513,7 +529,7 @@ async def on_startup():
             sense = None
     if not POSTURE_CSV.exists():
         if sense is not None:
-            sense.log_event(POSTURE_CSV, ["timestamp", "ok", "reason", "tilt_deg", "nod_deg", "session_adjustments", "tasks_completed_today"], {"timestamp": datetime.now().isoformat(), "ok": True, "reason": "startup", "tilt_deg": 0, "nod_deg": 0, "session_adjustments": 0, "tasks_completed_today": 0})
+            sense.log_event(POSTURE_CSV, POSTURE_FIELDS, {"timestamp": datetime.now().isoformat(), "ok": True, "reason": "startup", "tilt_deg": 0, "nod_deg": 0, "session_adjustments": 0, "tasks_completed_today": 0})
     if not TASK_CSV.exists():
         if sense is not None:
             sense.log_task_event("create", "Setup project")
@@ -1,7 +1,12 @@
-import os, requests
+import os, itertools, requests
 from dotenv import load_dotenv
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 BASE_DIR = Path(os.path.expanduser("~/pi_productivity"))
 dotenv_path = BASE_DIR / ".env"
 
@@ -29,6 +34,13 @@ class MotionClient:
         else:
             print("Warning: MOTION_API_KEY not set. Motion client will be non-functional.")
 
+    @staticmethod
+    def _json(r):
+        # orjson parses the raw bytes directly, skipping the r.text decode.
+        if orjson is not None:
+            return orjson.loads(r.content)
+        return r.json()
+
     def get(self, path, params=None):
         if not self.api_key:
             raise RuntimeError("MOTION_API_KEY is not configured.")
@@ -40,21 +52,21 @@ class MotionClient:
             print(f"[Motion API Error] {e}")
             print(f"[Motion API Error] Response body: {r.text}")
             raise
-        return r.json()
+        return self._json(r)
 
     def post(self, path, payload):
         if not self.api_key:
             raise RuntimeError("MOTION_API_KEY is not configured.")
         r = self.sess.post(f"{BASE}{path}", json=payload, timeout=15)
         r.raise_for_status()
-        return r.json()
+        return self._json(r)
 
     def patch(self, path, payload):
         if not self.api_key:
             raise RuntimeError("MOTION_API_KEY is not configured.")
         r = self.sess.patch(f"{BASE}{path}", json=payload, timeout=15)
         r.raise_for_status()
-        return r.json()
+        return self._json(r)
 
     def _extract_task_page(self, data):
         """Return ``(tasks, next_cursor, cursor_param)`` from *data*."""
@@ -103,10 +115,10 @@ class MotionClient:
 
         return tasks_list, next_cursor, cursor_param
 
-    def list_all_tasks_simple(self, limit=200):
+    def iter_all_tasks_simple(self):
+        """Yield tasks page by page, fetching the next page only when needed."""
         if not self.api_key:
-            return []
-        tasks = []
+            return
         cursor = None
         cursor_param = None
 
@@ -123,11 +135,7 @@ class MotionClient:
             page_tasks, next_cursor, next_cursor_param = self._extract_task_page(data)
             if not isinstance(page_tasks, list):
                 page_tasks = []
-            tasks.extend(page_tasks)
-
-            # If we have a limit and we've exceeded it, stop fetching more pages
-            if limit is not None and len(tasks) >= limit:
-                break
+            yield from page_tasks
 
             if not next_cursor:
                 break
@@ -135,16 +143,27 @@ class MotionClient:
             cursor = next_cursor
             cursor_param = next_cursor_param
 
-        # Trim to the requested limit
-        if limit is not None and len(tasks) > limit:
-            tasks = tasks[:limit]
-
-        return tasks
+    def list_all_tasks_simple(self, limit=200):
+        return list(itertools.islice(self.iter_all_tasks_simple(), limit))
 
     def find_task_by_name(self, needle):
-        if not needle: return None
+        if not needle or not self.api_key: return None
         nl = needle.lower()
-        for t in self.list_all_tasks_simple():
+
+        # Ask the API to filter by name first; only a handful of tasks come back.
+        try:
+            data = self.get("/tasks", params={"name": needle})
+            candidates, _, _ = self._extract_task_page(data)
+            for t in candidates[:20]:
+                name = (t.get("name") or t.get("title") or "")
+                if nl in name.lower():
+                    return t
+        except requests.HTTPError:
+            pass
+
+        # Fall back to scanning the first 200 tasks client-side (the same cap
+        # as list_all_tasks_simple), stopping at the first hit.
+        for t in itertools.islice(self.iter_all_tasks_simple(), 200):
             name = (t.get("name") or t.get("title") or "")
             if nl in name.lower():
                 return t
@@ -1,4 +1,7 @@
-import time, threading, math
+import os, time, threading, math
+
+# Defina SENSEHAT_MOCK_VERBOSE=1 para ver as ações do mock no terminal
+_MOCK_VERBOSE = os.getenv("SENSEHAT_MOCK_VERBOSE") == "1"
 
 class MockSenseHat:
     """A mock class for SenseHat for development on non-Raspberry Pi machines."""
@@ -6,16 +9,6 @@ class MockSenseHat:
         self.low_light = False
         self.pixels = [[0,0,0]] * 64
         self.stick = None
-        self.stick = None
-
-    def get_temperature(self):
-        return 22.5
-    
-    def get_humidity(self):
-        return 45.0
-    
-    def get_pressure(self):
-        return 1013.0
 
     def get_temperature(self):
         return 22.5
@@ -31,14 +24,16 @@ class MockSenseHat:
 
     def set_pixels(self, pixels):
         self.pixels = pixels
-        print("[MockSenseHat] Set pixels.")
+        if _MOCK_VERBOSE:
+            print("[MockSenseHat] Set pixels.")
 
     def clear(self, color=None):
-        color = color or [0,0,0]
-        print(f"[MockSenseHat] Cleared display with color {color}.")
+        if _MOCK_VERBOSE:
+            print(f"[MockSenseHat] Cleared display with color {color or [0,0,0]}.")
 
     def show_letter(self, letter, text_colour=None, back_colour=None):
-        print(f"[MockSenseHat] Displayed letter '{letter}'.")
+        if _MOCK_VERBOSE:
+            print(f"[MockSenseHat] Displayed letter '{letter}'.")
 
 try:
     from sense_hat import SenseHat
@@ -97,16 +92,24 @@ ROBOT_FRAMES = [
     ]
 ]
 
+# Quadros do robô já convertidos em pixels (cores padrão), montados uma vez
+_ROBOT_FRAMES_RENDERED = [[WHITE if v else BLACK for v in f] for f in ROBOT_FRAMES]
+
 def draw_frame(frame, color=WHITE, bg=BLACK):
     pixels = []
     for v in frame:
         pixels.append(color if v else bg)
     sense.set_pixels(pixels)
 
+def bar_pixels(bars, color):
+    '''Pixels de uma barra de progresso com as primeiras *bars* colunas acesas'''
+    row = [color] * bars + [BLACK] * (8 - bars)
+    return row * 8
+
 def animate_robot(times=6, delay=0.15):
     for _ in range(times):
-        for f in ROBOT_FRAMES:
-            draw_frame(f)
+        for pixels in _ROBOT_FRAMES_RENDERED:
+            sense.set_pixels(pixels)
             time.sleep(delay)
     sense.clear()
 
@@ -139,52 +142,43 @@ class BaseTimerMode:
 
 class TeleNeuroMode(BaseTimerMode):
     '''Timer de 1h, no fim anima robô'''
+    # Só existem 9 estados da barra (0..8 colunas); monta todos uma vez
+    _BAR_FRAMES = [bar_pixels(i, GREEN) for i in range(9)]
+
     def run(self):
-        start = time.time()
+        start = time.monotonic()
         duration = 60*60
         while self.is_running():
-            elapsed = time.time() - start
+            elapsed = time.monotonic() - start
             if elapsed >= duration:
                 animate_robot(times=10, delay=0.1)
-                start = time.time()
+                start = time.monotonic()
             else:
-                pct = elapsed / duration
-                bars = int(pct * 8)
-                pixels = []
-                for y in range(8):
-                    row = []
-                    for x in range(8):
-                        row.append(GREEN if x < bars else BLACK)
-                    pixels += row
-                sense.set_pixels(pixels)
+                bars = min(8, int(elapsed * 8 / duration))
+                sense.set_pixels(self._BAR_FRAMES[bars])
                 time.sleep(2)
 
 class TeleCMode(BaseTimerMode):
     '''Ciclos de 30 min; arco-íris pisca nos últimos 5 min'''
+    _BAR_FRAMES = [bar_pixels(i, BLUE) for i in range(9)]
+
     def run(self):
         block = 30*60
         warn = 5*60
-        start = time.time()
+        start = time.monotonic()
         while self.is_running():
-            elapsed = time.time() - start
+            elapsed = time.monotonic() - start
             remaining = block - elapsed
             if remaining <= 0:
                 sense.clear(WHITE); time.sleep(0.5)
                 sense.clear(BLACK); time.sleep(0.5)
-                start = time.time()
+                start = time.monotonic()
                 continue
             if remaining <= warn:
                 show_rainbow(pulse=True, step=16, duration=0.08)
             else:
-                pct = elapsed / block
-                bars = int(pct * 8)
-                pixels = []
-                for y in range(8):
-                    row = []
-                    for x in range(8):
-                        row.append(BLUE if x < bars else BLACK)
-                    pixels += row
-                sense.set_pixels(pixels)
+                bars = min(8, int(elapsed * 8 / block))
+                sense.set_pixels(self._BAR_FRAMES[bars])
                 time.sleep(2)
 
 class StudyADHDMode(BaseTimerMode):
@@ -193,9 +187,9 @@ class StudyADHDMode(BaseTimerMode):
         FOCUS = 20*60
         BREAK = 10*60
         while self.is_running():
-            start = time.time()
-            while self.is_running() and (time.time()-start) < FOCUS:
-                elapsed = time.time()-start
+            start = time.monotonic()
+            while self.is_running() and (time.monotonic()-start) < FOCUS:
+                elapsed = time.monotonic()-start
                 remain = FOCUS - elapsed
                 if remain <= 60:
                     sense.clear([255,255,0]); time.sleep(0.5)
@@ -203,32 +197,28 @@ class StudyADHDMode(BaseTimerMode):
                 else:
                     sense.clear(GREEN); time.sleep(1)
             if not self.is_running(): break
-            start = time.time()
-            while self.is_running() and (time.time()-start) < BREAK:
+            start = time.monotonic()
+            while self.is_running() and (time.monotonic()-start) < BREAK:
                 sense.clear([0,0,128]); time.sleep(1)
         sense.clear()
 
 class LeisureMode(BaseTimerMode):
     '''Animação de respiração/relax'''
+    # Um ciclo completo da onda em 32 passos (~2,6 s a 80 ms por passo)
+    _LUT = [[0, 0, int((1 + math.sin(i * 2 * math.pi / 32)) * 127)] for i in range(32)]
+
     def run(self):
-        t = 0.0
+        i = 0
         while self.is_running():
-            val = int((1 + math.sin(t))*127)
-            sense.clear([0,0,val])
+            sense.clear(self._LUT[i & 31])
             time.sleep(0.08)
-            t += 0.2
+            i += 1
 
 def check_for_movement():
-    acceleration = sense.get_accelerometer_raw()
-    x = acceleration['x']
-    y = acceleration['y']
-    z = acceleration['z']
-
-    x = abs(x)
-    y = abs(y)
-    z = abs(z)
-
-    if x > 1 or y > 1 or z > 1:
+    a = sense.get_accelerometer_raw()
+    # Uma só comparação com o quadrado da magnitude (em repouso ~1g, ou seja m2 ~1)
+    m2 = a['x']*a['x'] + a['y']*a['y'] + a['z']*a['z']
+    if m2 > 3.0:
         sense.show_letter("!")
     else:
         sense.clear()
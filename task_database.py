@@ -8,43 +8,192 @@ summary for the e-paper widget.
 
 from __future__ import annotations
 
+import hashlib
+import itertools
 import json
 import os
 import sqlite3
-from datetime import date, datetime, timedelta
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
 from pathlib import Path
-from typing import Iterable, List, Mapping, Sequence
-from collections import defaultdict
+from typing import Iterable, Iterator, List, Mapping
 
 from utils import normalize_and_format_date, today_local
 
+try:
+    import orjson
+except ImportError:  # Optional speed-up; fall back to the stdlib encoder.
+    orjson = None
+
 _DEFAULT_DB_PATH = Path(
     os.getenv("PI_PRODUCTIVITY_DB", "~/pi_productivity/data/tasks.db")
 ).expanduser()
 
 
+# Shared by the read queries and the partial index below; SQLite only uses
+# a partial index when the query repeats its WHERE terms verbatim.  Status
+# is stored lowercase and never NULL, so it is compared as is.
+_OPEN_TASK_FILTER = (
+    "status NOT IN ('completed', 'done', 'cancelled', 'canceled', 'archived')"
+)
+
+# Payload keys probed, in priority order, when normalising a task row.
+_ID_KEYS = ("id", "taskId", "uid", "_id")
+_TITLE_KEYS = ("name", "title", "summary", "description")
+_DUE_KEYS = ("dueDate", "due", "due_date", "deadline", "end")
+
+# Container types _extract_subtitle joins as a label list.
+_LIST_TYPES = (list, tuple)
+
+# Weekday abbreviations, Monday first (matches date.weekday()).
+_DAY_NAMES = ("Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom")
+
+# Column order matches the tuples built by TaskDatabase._normalise_task_tuple.
+_UPSERT_HEAD = """
+    INSERT INTO tasks (task_id, title, subtitle, due_date, status, raw, updated_at)
+    VALUES """
+_UPSERT_ROW = "(?, ?, ?, ?, ?, ?, ?)"
+_UPSERT_TAIL = """
+    ON CONFLICT(task_id) DO UPDATE SET
+        title = excluded.title,
+        subtitle = excluded.subtitle,
+        due_date = excluded.due_date,
+        status = excluded.status,
+        raw = excluded.raw,
+        updated_at = excluded.updated_at
+"""
+_UPSERT_SQL = _UPSERT_HEAD + _UPSERT_ROW + _UPSERT_TAIL
+
+# Rows per multi-row upsert statement: 7 columns x 100 rows = 700 bound
+# variables, below the 999 limit of older SQLite builds.
+_UPSERT_CHUNK = 100
+_UPSERT_CHUNK_SQL = (
+    _UPSERT_HEAD + ", ".join([_UPSERT_ROW] * _UPSERT_CHUNK) + _UPSERT_TAIL
+)
+
+
 def _ensure_parent(path: Path) -> None:
     """Create the parent directory for *path* if it does not exist."""
 
     path.parent.mkdir(parents=True, exist_ok=True)
 
 
+def _canonical_json_bytes(payload: object) -> bytes:
+    """Serialise *payload* to compact, key-sorted UTF-8 JSON with the stdlib.
+
+    The output does not depend on whether ``orjson`` is installed (the two
+    encoders format some floats differently), so it is safe to hash.
+    """
+
+    return json.dumps(
+        payload,
+        ensure_ascii=False,
+        default=str,
+        sort_keys=True,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _json_bytes(payload: object) -> bytes:
+    """Serialise *payload* to compact, key-sorted UTF-8 JSON.
+
+    Uses ``orjson`` when available, falling back to the stdlib encoder
+    with the same compact layout so stored rows stay small.
+    """
+
+    if orjson is not None:
+        return orjson.dumps(payload, default=str, option=orjson.OPT_SORT_KEYS)
+    return _canonical_json_bytes(payload)
+
+
+def _json_loads(value: str | bytes) -> object:
+    """Parse JSON text, using ``orjson`` when available."""
+
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
+
+
 class TaskDatabase:
     """Wrapper around the SQLite file used by the project."""
 
     def __init__(self, db_path: Path | str | None = None):
         self.path = Path(db_path).expanduser() if db_path else _DEFAULT_DB_PATH
         _ensure_parent(self.path)
+        # The background sync thread writes through one connection; the web
+        # handlers read through a second, read-only one so a running sync
+        # does not hold them up.  Each lock serialises access to its own
+        # connection; WAL lets the reader see the last commit meanwhile.
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._read_lock = threading.Lock()
+        # ((data_version, limit, today), items) of the last display query.
+        self._display_cache: tuple[tuple, List[dict]] | None = None
+        # task_id -> digest of the payload last written for it, so polls
+        # that return unchanged tasks do not rewrite their rows.
+        self._seen: dict[str, str] = {}
         self._initialise()
-
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.path)
-        conn.execute("PRAGMA journal_mode=WAL")
-        conn.row_factory = sqlite3.Row
+        # Opened after _initialise so the file, schema and WAL mode exist.
+        self._reader = self._connect(read_only=True)
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        # isolation_level=None turns off the module's implicit BEGIN/COMMIT:
+        # writes open their transaction explicitly in _write_transaction,
+        # and the reader never leaves a read transaction open that would pin
+        # an old snapshot of the WAL.
+        if read_only:
+            conn = sqlite3.connect(
+                f"{self.path.resolve().as_uri()}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+        else:
+            conn = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL keeps the database consistent with NORMAL sync; only the
+            # last commits may be lost on power failure, which a re-sync
+            # restores.
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-8000")
+        conn.execute("PRAGMA mmap_size=67108864")
         return conn
 
+    @contextmanager
+    def _write_transaction(self) -> Iterator[sqlite3.Connection]:
+        """Hold the write lock and an immediate transaction on the writer.
+
+        Commits when the block exits normally and rolls back if it raises.
+        """
+
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                # SQLite may already have rolled back on its own (e.g. disk
+                # full); a second ROLLBACK would mask the original error.
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        """Close the underlying SQLite connections."""
+
+        with self._read_lock:
+            self._reader.close()
+        with self._lock:
+            self._conn.close()
+
     def _initialise(self) -> None:
-        with self._connect() as conn:
+        with self._write_transaction() as conn:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS tasks (
@@ -64,82 +213,126 @@ class TaskDatabase:
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status)"
             )
+            # Rows written before status was normalised on upsert.
+            conn.execute(
+                "UPDATE tasks SET status = LOWER(status) WHERE status <> LOWER(status)"
+            )
+            conn.execute("UPDATE tasks SET status = 'pending' WHERE status IS NULL")
+            # Covers only open, dated tasks in (due_date, updated_at DESC)
+            # order, so the weekly queries become a short index range walk
+            # with no sort step and LIMIT can stop early.
+            conn.execute(
+                f"""
+                CREATE INDEX IF NOT EXISTS idx_tasks_open_week
+                ON tasks(due_date ASC, updated_at DESC)
+                WHERE due_date IS NOT NULL AND {_OPEN_TASK_FILTER}
+                """
+            )
 
     # ------------------------------------------------------------------
     # Synchronisation helpers
     # ------------------------------------------------------------------
-    def upsert_motion_tasks(self, tasks: Sequence[Mapping[str, object]]) -> int:
+    def upsert_motion_tasks(self, tasks: Iterable[Mapping[str, object]]) -> int:
         """Store/refresh tasks coming from the Motion API.
 
         ``MotionClient`` returns a list of dictionaries.  Their shape may
         change over time, so we keep the raw payload while extracting a
         few common fields that are useful for the e-paper panel.
+
+        *tasks* may be any iterable; it is consumed once, in chunks, so it
+        is never copied into a list.  Returns the number of rows written.
         """
 
-        now = datetime.utcnow().isoformat(timespec="seconds")
-        normalised = [self._normalise_task(t, now) for t in tasks]
-        if not normalised:
+        # One UTC timestamp for the whole batch, same layout as
+        # datetime.isoformat(timespec="seconds") without building a datetime.
+        now = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
+        written: dict[str, str] = {}
+
+        def _rows():
+            # Normalise lazily so at most one chunk of rows is held in
+            # memory instead of every normalised copy at once.  The per-row
+            # callables are bound to locals once, outside the loop.
+            task_id_of = self._task_id
+            normalise = self._normalise_task_tuple
+            seen = self._seen.get
+            pending = written.get
+            blake2b = hashlib.blake2b
+            for task in tasks:
+                raw = _json_bytes(task)
+                task_id = task_id_of(task)
+                # Equality check only; blake2b is in hashlib and fast.
+                digest = blake2b(raw, digest_size=8).hexdigest()
+                if seen(task_id) == digest or pending(task_id) == digest:
+                    continue
+                written[task_id] = digest
+                yield normalise(task, task_id, raw, now)
+
+        if not tasks:
             return 0
-        with self._connect() as conn:
-            conn.executemany(
-                """
-                INSERT INTO tasks (task_id, title, subtitle, due_date, status, raw, updated_at)
-                VALUES (:task_id, :title, :subtitle, :due_date, :status, :raw, :updated_at)
-                ON CONFLICT(task_id) DO UPDATE SET
-                    title = excluded.title,
-                    subtitle = excluded.subtitle,
-                    due_date = excluded.due_date,
-                    status = excluded.status,
-                    raw = excluded.raw,
-                    updated_at = excluded.updated_at
-                """,
-                normalised,
-            )
-        return len(normalised)
+        with self._write_transaction() as conn:
+            # Full chunks go through one multi-row statement each; the
+            # leftover rows reuse the single-row statement.
+            rows = _rows()
+            while chunk := list(itertools.islice(rows, _UPSERT_CHUNK)):
+                if len(chunk) == _UPSERT_CHUNK:
+                    conn.execute(
+                        _UPSERT_CHUNK_SQL, list(itertools.chain.from_iterable(chunk))
+                    )
+                else:
+                    conn.executemany(_UPSERT_SQL, chunk)
+        # Only remember digests once the rows are committed.
+        self._seen.update(written)
+        return len(written)
 
-    def _normalise_task(self, payload: Mapping[str, object], updated_at: str) -> Mapping[str, object]:
-        get = payload.get
-        task_id = get("id") or get("taskId") or get("uid") or get("_id")
+    @staticmethod
+    def _task_id(payload: Mapping[str, object]) -> str:
+        """Return the id for *payload*, derived from its content if missing."""
+
+        task_id = next(filter(None, map(payload.get, _ID_KEYS)), None)
         if task_id is None:
-            task_id = hash(json.dumps(payload, sort_keys=True))
-        task_id = str(task_id)
-
-        title = (
-            get("name")
-            or get("title")
-            or get("summary")
-            or get("description")
-            or "Tarefa sem nome"
+            # Derive a stable id from the content; hash() is salted per process.
+            task_id = hashlib.sha1(_canonical_json_bytes(payload)).hexdigest()
+        return str(task_id)
+
+    def _normalise_task_tuple(
+        self,
+        payload: Mapping[str, object],
+        task_id: str,
+        raw: bytes,
+        updated_at: str,
+    ) -> tuple:
+        """Return the ``tasks`` row for *payload* in ``_UPSERT_SQL`` column order."""
+
+        get = payload.get
+
+        # First non-blank string wins; stripping happens once, in the same pass.
+        title = next(
+            (
+                text
+                for value in map(get, _TITLE_KEYS)
+                if isinstance(value, str) and (text := value.strip())
+            ),
+            "Tarefa sem nome",
         )
-        title = str(title).strip() or "Tarefa sem nome"
 
         subtitle = self._extract_subtitle(payload)
 
-        raw_due = (
-            get("dueDate")
-            or get("due")
-            or get("due_date")
-            or get("deadline")
-            or get("end")
-        )
+        raw_due = next(filter(None, map(get, _DUE_KEYS)), None)
         due_date = normalize_and_format_date(raw_due)
 
-        status = (
-            get("status")
-            or ("completed" if bool(get("completed")) else "pending")
-            or "pending"
+        # Stored lowercase so queries can compare it without LOWER().
+        status = get("status") or ("completed" if get("completed") else "pending")
+        status = str(status).strip().lower() or "pending"
+
+        return (
+            task_id,
+            title,
+            subtitle,
+            due_date,
+            status,
+            raw.decode("utf-8"),
+            updated_at,
         )
-        status = str(status)
-
-        return {
-            "task_id": task_id,
-            "title": title,
-            "subtitle": subtitle,
-            "due_date": due_date,
-            "status": status,
-            "raw": json.dumps(payload, ensure_ascii=False, default=str),
-            "updated_at": updated_at,
-        }
 
     @staticmethod
     def _extract_subtitle(payload: Mapping[str, object]) -> str:
@@ -147,12 +340,10 @@ class TaskDatabase:
             return str(value).strip()
 
         labels = payload.get("labels") or payload.get("labelNames")
-        if isinstance(labels, Iterable) and not isinstance(labels, (str, bytes, dict)):
-            clean = [
-                _stringify(lbl)
-                for lbl in labels
-                if _stringify(lbl)
-            ]
+        # JSON-decoded label arrays are always lists; an exact type check
+        # avoids the ABC machinery behind isinstance(..., Iterable).
+        if type(labels) in _LIST_TYPES:
+            clean = [text for lbl in labels if (text := str(lbl).strip())]
             if clean:
                 return ", ".join(clean[:3])
         if labels:
@@ -160,7 +351,8 @@ class TaskDatabase:
 
         description = payload.get("description") or payload.get("note")
         if isinstance(description, str):
-            first_line = description.strip().splitlines()[0]
+            # Only the first line is needed; avoid splitting the whole text.
+            first_line = description.strip().partition("\n")[0].rstrip("\r")
             if first_line:
                 return first_line[:60]
 
@@ -186,6 +378,12 @@ class TaskDatabase:
         
         return start_of_week.isoformat(), end_of_week.isoformat()
 
+    @staticmethod
+    def _day_after(value: str) -> str:
+        """Return the ISO date following *value* (an ISO date string)."""
+
+        return (date.fromisoformat(value) + timedelta(days=1)).isoformat()
+
     def fetch_items_for_display(self, limit: int = 6) -> List[dict]:
         """Return a list of simplified entries for the e-paper display.
         
@@ -194,22 +392,31 @@ class TaskDatabase:
 
         today = today_local()
         week_start, week_end = self._get_week_range(today)
+        week_stop = self._day_after(week_end)
         try:
-            with self._connect() as conn:
-                rows = conn.execute(
-                    """
-                    SELECT task_id, title, subtitle, due_date, status
+            with self._read_lock:
+                # data_version changes whenever the write connection commits,
+                # so an unchanged key means the previous result still holds.
+                version = self._reader.execute("PRAGMA data_version").fetchone()[0]
+                key = (version, limit, today)
+                cached = self._display_cache
+                if cached is not None and cached[0] == key:
+                    return list(cached[1])
+                rows = self._reader.execute(
+                    f"""
+                    SELECT task_id, title, subtitle, due_date, status,
+                           CAST(julianday(substr(due_date, 1, 10)) - julianday(?) AS INTEGER) AS day_delta
                     FROM tasks
-                    WHERE COALESCE(LOWER(status), 'pending') NOT IN ('completed', 'done', 'cancelled', 'canceled', 'archived')
+                    WHERE {_OPEN_TASK_FILTER}
                       AND due_date IS NOT NULL
-                      AND DATE(due_date) >= ?
-                      AND DATE(due_date) <= ?
+                      AND due_date >= ?
+                      AND due_date < ?
                     ORDER BY
                         due_date ASC,
                         updated_at DESC
                     LIMIT ?
                     """,
-                    (week_start, week_end, limit),
+                    (today.isoformat(), week_start, week_stop, limit),
                 ).fetchall()
         except sqlite3.Error as exc:
             return [
@@ -221,56 +428,57 @@ class TaskDatabase:
             ]
 
         if not rows:
-            return [
+            items = [
                 {
                     "title": "Sem tarefas esta semana",
                     "subtitle": "Aproveite para planejar ou descansar!",
                     "right": "",
                 }
             ]
+            self._display_cache = (key, items)
+            return list(items)
 
         items: List[dict] = []
-        for row in rows:
-            due_display = self._format_due(row["due_date"], today)
-            subtitle = row["subtitle"] or ""
-            status = (row["status"] or "").lower()
+        for task_id, title, subtitle, due_date, status, day_delta in rows:
+            due_display = self._format_due(due_date, day_delta, today)
+            subtitle = subtitle or ""
             if status and status not in {"pending", "open", "todo"}:
                 tag = status.upper()
                 subtitle = f"{subtitle} [{tag}]".strip()
             items.append(
                 {
-                    "task_id": row["task_id"],
-                    "title": row["title"],
+                    "task_id": task_id,
+                    "title": title,
                     "subtitle": subtitle,
                     "right": due_display,
                 }
             )
-        return items
+        self._display_cache = (key, items)
+        return list(items)
 
     @staticmethod
-    def _format_due(value: str | None, today: date) -> str:
+    def _format_due(value: str | None, delta: int | None, today: date) -> str:
+        """Format a due date given its distance in days from *today*.
+
+        *delta* is computed by SQLite and is ``None`` when *value* is not
+        a valid date.
+        """
+
         if not value:
             return ""
-        try:
-            dt = datetime.fromisoformat(value)
-        except Exception:  # noqa: BLE001
+        if delta is None:
             return value[:10]
-        due_date = dt.date()
-        if due_date == today:
-            return "HOJE"
-        if due_date < today:
-            delta = (today - due_date).days
-            if delta == 1:
-                return "Ontem"
-            return f"-{delta}d"
-        delta = (due_date - today).days
         if delta == 0:
             return "HOJE"
+        if delta < 0:
+            if delta == -1:
+                return "Ontem"
+            return f"{delta}d"
         if delta == 1:
             return "Amanhã"
         if delta <= 7:
-            return f"{dt.strftime('%a')}"
-        return dt.strftime("%d/%m")
+            return _DAY_NAMES[(today.weekday() + delta) % 7]
+        return f"{value[8:10]}/{value[5:7]}"
 
     def fetch_week_calendar(self, limit: int = 100) -> dict:
         """
@@ -288,21 +496,34 @@ class TaskDatabase:
         """
         today = today_local()
         week_start, week_end = self._get_week_range(today)
+        week_stop = self._day_after(week_end)
         
         try:
-            with self._connect() as conn:
-                rows = conn.execute(
-                """
-                SELECT task_id, title, subtitle, due_date, status, raw
-                FROM tasks
-                WHERE COALESCE(LOWER(status), 'pending') NOT IN ('completed', 'done', 'cancelled', 'canceled', 'archived')
-                  AND due_date IS NOT NULL
-                  AND DATE(due_date) >= ?
-                  AND DATE(due_date) <= ?
-                ORDER BY due_date ASC, updated_at DESC
-                LIMIT ?
+            with self._read_lock:
+                # SQLite groups the week's tasks per day and builds each
+                # day's task list as JSON, so at most 7 rows come back.
+                rows = self._reader.execute(
+                f"""
+                SELECT day, json_group_array(json_object(
+                    'task_id', task_id,
+                    'title', title,
+                    'subtitle', COALESCE(subtitle, ''),
+                    'status', status
+                )) AS tasks
+                FROM (
+                    SELECT substr(due_date, 1, 10) AS day, task_id, title, subtitle, status
+                    FROM tasks
+                    WHERE {_OPEN_TASK_FILTER}
+                      AND due_date IS NOT NULL
+                      AND due_date >= ?
+                      AND due_date < ?
+                    ORDER BY due_date ASC, updated_at DESC
+                    LIMIT ?
+                )
+                GROUP BY day
+                ORDER BY day
                 """,
-                (week_start, week_end, limit),
+                (week_start, week_stop, limit),
                 ).fetchall()
         except sqlite3.Error as exc:
             return {
@@ -312,18 +533,9 @@ class TaskDatabase:
                 "error": str(exc)
             }
         
-        tasks_by_date = defaultdict(list)
-        for row in rows:
-            due_date = row["due_date"][:10]
-            tasks_by_date[due_date].append({
-                "task_id": row["task_id"],
-                "title": row["title"],
-                "subtitle": row["subtitle"] or "",
-                "status": row["status"] or "pending"
-            })
+        tasks_by_date = {day: _json_loads(tasks) for day, tasks in rows}
         
         start_date = date.fromisoformat(week_start)
-        day_names = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
         days = []
         for i in range(7):
             current_date = start_date + timedelta(days=i)
@@ -331,7 +543,7 @@ class TaskDatabase:
             
             days.append({
                 "date": date_str,
-                "day_name": day_names[i],
+                "day_name": _DAY_NAMES[i],
                 "day_number": current_date.day,
                 "is_today": current_date == today,
                 "tasks": tasks_by_date.get(date_str, [])
@@ -1,9 +1,18 @@
 from datetime import datetime, date
+from functools import lru_cache
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import os
+import re
+
+# Anything strptime('%Y-%m-%d') could still accept once fromisoformat has failed.
+_LOOSE_DATE_RE = re.compile(r"\d{4}-\d{1,2}-\d{1,2}")
 
 def get_tz():
-    tzname = os.getenv("TIMEZONE", "UTC")
+    return _tz_for(os.getenv("TIMEZONE", "UTC"))
+
+@lru_cache(maxsize=4)
+def _tz_for(tzname):
+    # Resolved once per name, so a failed lookup isn't retried on every call.
     try:
         return ZoneInfo(tzname)
     except ZoneInfoNotFoundError:
@@ -44,8 +53,10 @@ def normalize_and_format_date(value: object | None) -> str | None:
             # Handles full ISO 8601 format
             dt = datetime.fromisoformat(candidate.replace('Z', '+00:00'))
         except ValueError:
+            if not _LOOSE_DATE_RE.fullmatch(candidate):
+                return None
             try:
-                # Handles simple 'YYYY-MM-DD'
+                # Handles unpadded dates like '2025-1-5'
                 dt = datetime.strptime(candidate, '%Y-%m-%d')
             except ValueError:
                 return None